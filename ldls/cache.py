@@ -1,13 +1,18 @@
 from __future__ import annotations
 
+import io
+import json
 import logging
 import os
 import re
+import stat
+import sys
+from functools import lru_cache
 from pathlib import Path
 from typing import Iterable, NamedTuple, cast
 from urllib.parse import quote
 
-from trld.api import parse_rdf, serialize_rdf, text_input
+from trld.api import parse_rdf, serialize_rdf
 from trld.jsonld.base import JsonMap, as_list
 from trld.jsonld.compaction import compact
 from trld.jsonld.context import get_context
@@ -16,8 +21,10 @@ from trld.jsonld.expansion import expand
 from trld.jsonld.extras.frameblanks import frameblanks
 from trld.jsonld.flattening import flatten
 from trld.jsonld.keys import CONTEXT, GRAPH, ID, LANGUAGE, TYPE, VALUE, VOCAB
-from trld.trig.parser import (NotationError, ParserError, ParserState,
-                              ReadPrefix, ReadSymbol, ReadTerm)
+from trld.mimetypes import SUFFIX_MIME_TYPE_MAP
+from trld.platform.io import Input
+from trld.trig.parser import (NotationError, ParserError, ReadPrefix,
+                              ReadSymbol)
 
 from . import Err, TermInfo
 from .utils import split_iri
@@ -27,6 +34,9 @@ logger = logging.getLogger(__name__)
 
 class GraphCache:
 
+    # NOTE: Increase this whenever the distilled terms change.
+    TERMS_FORMAT_VERSION = 1
+
     cachedir: Path
     mtime_map: dict[str, float]
     vocab_source_map: dict[str, str]
@@ -43,6 +53,19 @@ class GraphCache:
         self._monkeypatch_parser()
 
     def collect_vocab_terms(self, ns: str) -> dict[str, TermInfo]:
+        ns = sys.intern(ns)
+
+        terms = self._load_vocab_terms(ns)
+        if terms is None:
+            terms = self._distill_vocab_terms(ns)
+            self._save_vocab_terms(ns, terms)
+
+        if ns not in self._terms_cache:
+            self._terms_cache[ns] = set(terms)
+
+        return terms  # TODO: OrderedDict
+
+    def _distill_vocab_terms(self, ns: str) -> dict[str, TermInfo]:
         data = self._load(ns)
         ctx = cast(dict, data.get(CONTEXT)) or {}
 
@@ -64,30 +87,85 @@ class GraphCache:
             rtype: str | None = None
             rcomment: str | None = None
 
-            for rtype in desc.get(TYPE):
-                break
+            types = desc[TYPE]
+            if isinstance(types, str):
+                rtype = types
+            elif types:
+                rtype = types[0]
+
+            comments = desc.get('rdfs:comment')
+            if isinstance(comments, str):
+                rcomment = comments
+            elif isinstance(comments, dict):
+                rcomment = str(comments.get(VALUE))
+            elif comments:
+                for res_comment in comments:
+                    if isinstance(res_comment, str):
+                        rcomment = res_comment
+                    elif isinstance(res_comment, dict):
+                        # TODO: $LANG or 'en_us' or 'en_gb' or 'en'
+                        rcomment = str(res_comment.get(VALUE))
+                        break
+
+            if rtype is not None:
+                rtype = sys.intern(rtype)
+
+            terms[sys.intern(leaf)] = TermInfo(rtype, rcomment)
+
+        return terms
+
+    def _load_vocab_terms(self, ns: str) -> dict[str, TermInfo] | None:
+        terms_path = self._get_terms_path(ns)
+        terms_stat = _stat(terms_path)
+        if not terms_stat:
+            return None
 
-            for res_comment in as_list(desc.get('rdfs:comment')):
-                if isinstance(res_comment, str):
-                    rcomment = res_comment
-                elif isinstance(res_comment, dict):
-                    # TODO: $LANG or 'en_us' or 'en_gb' or 'en'
-                    rcomment = str(res_comment.get(VALUE))
-                    break
+        src_stat = _stat(ns)
+        if not (src_stat and stat.S_ISREG(src_stat.st_mode)):
+            src_stat = _stat(self._get_fs_path(ns))
+        if not src_stat or terms_stat.st_mtime < src_stat.st_mtime:
+            return None
 
-            terms[leaf] = TermInfo(rtype, rcomment)
+        try:
+            with terms_path.open() as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
 
-        if ns not in self._terms_cache:
-            self._terms_cache[ns] = set(terms)
+        version = data.get('version') if isinstance(data, dict) else None
+        if version != self.TERMS_FORMAT_VERSION:
+            logger.debug("Outdated terms of <%s> in '%s'", ns, terms_path)
+            return None
 
-        return terms  # TODO: OrderedDict
+        logger.debug("Load terms of <%s> from '%s'", ns, terms_path)
+        try:
+            return {
+                sys.intern(leaf): TermInfo(
+                    sys.intern(rtype) if rtype else None, rcomment
+                )
+                for leaf, (rtype, rcomment) in data['terms'].items()
+            }
+        except (KeyError, TypeError, ValueError, AttributeError):
+            logger.debug("Invalid terms of <%s> in '%s'", ns, terms_path)
+            return None
+
+    def _save_vocab_terms(self, ns: str, terms: dict[str, TermInfo]) -> None:
+        terms_path = self._get_terms_path(ns)
+        logger.debug("Saving terms of <%s> to '%s'", ns, terms_path)
+        try:
+            with terms_path.open('w') as f:
+                data = {'version': self.TERMS_FORMAT_VERSION, 'terms': terms}
+                json.dump(data, f, ensure_ascii=False)
+        except OSError:  # e.g. a read-only shared cache dir
+            logger.debug("Could not save terms to '%s'", terms_path)
 
     def _load(self, url: str) -> JsonMap:
         src = self.vocab_source_map.get(str(url), url)
 
-        if os.path.isfile(url):
+        url_stat = _stat(url)
+        if url_stat and stat.S_ISREG(url_stat.st_mode):
             last_vocab_mtime = self.mtime_map.get(url)
-            vocab_mtime = os.stat(url).st_mtime
+            vocab_mtime = url_stat.st_mtime
 
             if not last_vocab_mtime or last_vocab_mtime < vocab_mtime:
                 logger.debug("Parse file: '%s'", url)
@@ -96,13 +174,13 @@ class GraphCache:
 
         cache_path = self._get_fs_path(url)
 
-        if cache_path.exists() and cache_path.stat().st_size > 0:
+        cache_stat = _stat(cache_path)
+        if cache_stat and cache_stat.st_size > 0:
             logger.debug("Load local copy of <%s> from '%s'", url, cache_path)
             return self._read(cache_path)
         else:  # Fetch and add serialized Turtle to cache
             logger.debug("Fetching <%s> to '%s'", url, cache_path)
             data = self._read(url)
-            recompact(data, self.prefixes._ns_by_prefix)
 
             serialize_rdf(data, 'turtle', cache_path)
 
@@ -113,48 +191,48 @@ class GraphCache:
         return data
 
     def _get_fs_path(self, url: str) -> Path:
-        return self.cachedir / (quote(url, safe="") + '.ttl')
+        return self.cachedir / (_quote_url(url) + '.ttl')
 
-    def check_data(self, data: str, fmt: str | None) -> Err | None:
+    def _get_terms_path(self, url: str) -> Path:
+        return self.cachedir / (_quote_url(url) + '.terms.json')
+
+    def check_data(self, lines: Iterable[str], fmt: str | None) -> Err | None:
+        inp = Input(_LinesReader(lines), {'Accept': SUFFIX_MIME_TYPE_MAP['trig']})
         try:
-            # TODO: io wrapper to iterate over buffer directly?
-            _ = parse_rdf(text_input(data), fmt)
+            _ = parse_rdf(inp, fmt)
         except ParserError as e:
             return Err(e.lno - 1, e.cno - 1, str(e.error))
         else:
             return None
 
     def _monkeypatch_parser(self):
-        _real_ReadTerm_pop = ReadTerm.pop
+        _real_ReadSymbol_pop = ReadSymbol.pop
 
         graphcache = self
 
-        def _monkey_ReadTerm_pop(self: ReadTerm):
-            value = _real_ReadTerm_pop(self)
+        def _monkey_ReadSymbol_pop(self: ReadSymbol):
+            value = _real_ReadSymbol_pop(self)
 
-            parent: ParserState | None = self.parent
-            while parent:
-                if isinstance(parent, ReadPrefix):
-                    return value
-                parent = getattr(parent, 'parent', None)
+            pfx, cln, local = value.partition(':')
+            if not cln or pfx == '_':
+                return value
 
-            if isinstance(self, ReadSymbol) and ':' in value:
-                pfx, local = value.split(':', 1)
-                if pfx == '_':
-                    return value
+            # NOTE: ReadPrefix reads its symbols as direct children.
+            if isinstance(self.parent, ReadPrefix):
+                return value
 
-                ns = self.context.get(pfx or VOCAB)
+            ns = self.context.get(pfx or VOCAB)
 
-                if ns is None:
-                    raise NotationError(f"Undeclared prefix for {value}")
+            if ns is None:
+                raise NotationError(f"Undeclared prefix for {value}")
 
-                terms = graphcache._terms_cache.get(ns)
-                if terms and local not in terms:
-                    raise NotationError(f"Term {value} is not defined in <{ns}>")
+            terms = graphcache._terms_cache.get(ns)
+            if terms and local not in terms:
+                raise NotationError(f"Term {value} is not defined in <{ns}>")
 
             return value
 
-        ReadTerm.pop = _monkey_ReadTerm_pop  # type: ignore[method-assign]
+        ReadSymbol.pop = _monkey_ReadSymbol_pop  # type: ignore[method-assign]
 
 
 class PrefixCache:
@@ -174,13 +252,16 @@ class PrefixCache:
         if prefix_file.is_file():
             self._load_prefixes(prefix_file)
 
-    def _load_prefixes(self, src: str | Path) -> None:
+    def _load_prefixes(self, src: str | Path) -> dict[str, str]:
+        loaded: dict[str, str] = {}
         data = parse_rdf(str(src))
         if CONTEXT in data:
             for k, v in cast(dict, data[CONTEXT]).items():
                 if isinstance(v, str):
                     self._ns_by_prefix[k] = v
                     self._prefix_by_ns[v] = k
+                    loaded[k] = v
+        return loaded
 
     def compact(self, iri: str) -> str:
         ns, local = split_iri(iri)
@@ -198,20 +279,63 @@ class PrefixCache:
     def _fetch_ns(self, pfx: str) -> str | None:
         url = self.PREFIX_URI_TEMPLATE.format(pfx=pfx)
         logger.debug("Fetching <%s>", url)
+        loaded: dict[str, str] = {}
         try:
-            self._load_prefixes(url)
+            loaded = self._load_prefixes(url)
         except:  # not found or syntax error...
             logger.debug("Could not read <%s>", url)
 
-        if self._prefix_file:
-            logger.debug("Saving prefixes to '%s'", self._prefix_file)
-            with self._prefix_file.open('w') as f:
-                for pfx, ns in self._ns_by_prefix.items():
-                    print(f"PREFIX {pfx}: <{ns}>", file=f)
+        if self._prefix_file and loaded:
+            logger.debug("Adding prefixes to '%s'", self._prefix_file)
+            # NOTE: Appending is safe since later declarations override earlier.
+            with self._prefix_file.open('a') as f:
+                for loaded_pfx, ns in loaded.items():
+                    print(f"PREFIX {loaded_pfx}: <{ns}>", file=f)
 
         return self._ns_by_prefix.get(pfx)
 
 
+class _LinesReader(io.TextIOBase):
+    """Read from lines of text without joining them up front."""
+
+    def __init__(self, lines: Iterable[str]):
+        self._lines = iter(lines)
+        self._rest = ''
+
+    def readable(self) -> bool:
+        return True
+
+    def readline(self, size: int | None = -1) -> str:
+        line, self._rest = self._rest or next(self._lines, ''), ''
+        if size is not None and 0 <= size < len(line):
+            line, self._rest = line[:size], line[size:]
+        return line
+
+    def read(self, size: int | None = -1) -> str:
+        if size is None or size < 0:
+            text = self._rest + ''.join(self._lines)
+            self._rest = ''
+            return text
+
+        chunks: list[str] = []
+        while size > 0 and (line := self.readline(size)):
+            chunks.append(line)
+            size -= len(line)
+        return ''.join(chunks)
+
+
+def _stat(path: str | Path) -> os.stat_result | None:
+    try:
+        return os.stat(path)
+    except (OSError, ValueError):
+        return None
+
+
+@lru_cache(maxsize=256)
+def _quote_url(url: str) -> str:
+    return quote(url, safe="")
+
+
 def recompact(data: dict, prefixes: dict) -> dict:
     context = {CONTEXT: prefixes}
     base_iri = ""
@@ -1,21 +1,28 @@
 from __future__ import annotations
 
+import logging
 import os
 import re
-from itertools import chain
+import threading
+from functools import lru_cache
+from heapq import merge
 from os.path import expanduser
 from pathlib import Path
-from typing import Iterable
+from typing import Iterable, NamedTuple
 
 from . import Completion, Err, TermInfo
 from .cache import GraphCache
-from .keywords import LANG_KEYWORDS
-from .utils import get_term_at
+from .keywords import LANG_KEYWORDS_SORTED
+from .utils import get_term_at, prefixed_slice
+
+logger = logging.getLogger(__name__)
 
 MAX_LINE_SCAN = 80
 MATCH_NS_DECL = re.compile(
     r'''(?:@prefix\s+|xmlns:?|vocab|prefix\s+|PREFIX\s+|")(?:@vocab|(\w*))"?[:=]\s*[<"'"](.+?)[>"']'''
 )
+# Any line matching MATCH_NS_DECL contains at least one of these:
+NS_DECL_MARKERS = ('prefix', 'PREFIX', 'xmlns', 'vocab', '"')
 
 VOCAB_SOURCE_MAP = {
     "https://schema.org/": "https://schema.org/version/latest/schemaorg-current-https.ttl",
@@ -51,38 +58,102 @@ def find_rdf_graph_cache_dir() -> Path:
 
 
 def get_pfxns(line: str) -> Iterable[tuple[str, str]]:
+    if not any(marker in line for marker in NS_DECL_MARKERS):
+        return ()
     return MATCH_NS_DECL.findall(line)
 
 
 def get_pfxns_map(buffer: Lines) -> dict[str, str]:
-    return {pfx: ns for line in buffer[:MAX_LINE_SCAN] for pfx, ns in get_pfxns(line)}
+    return _get_region_pfxns_map(tuple(buffer[:MAX_LINE_SCAN]))
+
+
+@lru_cache(maxsize=4)
+def _get_region_pfxns_map(region: tuple[str, ...]) -> dict[str, str]:
+    # NOTE: The result is shared between calls; callers must not modify it.
+    return {pfx: ns for line in region for pfx, ns in get_pfxns(line)}
+
+
+def _ends_term(line: str, i: int) -> bool:
+    return i == len(line) or not (line[i].isalnum() or line[i] in '-_:')
+
+
+class _VocabIndex(NamedTuple):
+    by_leaf: dict[str, TermInfo]
+    sorted_keys: list[str]
+    sorted_items: list[tuple[str, TermInfo]]
+
+
+# NOTE: Shared; only used internally, and never modified.
+_EMPTY_VOCAB_INDEX = _VocabIndex({}, [], [])
 
 
 class RdfCompleter:
     graphcache: GraphCache
-    _terms_by_ns: dict[str, dict[str, TermInfo] | None]
+    _terms_by_ns: dict[str, _VocabIndex]
+    _terms_locks: dict[str, threading.Lock]
+    _prewarm_failed: set[str]
 
     def __init__(self, cachedir=None):
         if cachedir is None:
             cachedir = find_rdf_graph_cache_dir()
         self.graphcache = GraphCache(cachedir, VOCAB_SOURCE_MAP)
         self._terms_by_ns = {}
-        self._keywords = LANG_KEYWORDS
+        self._terms_locks = {}
+        self._prewarm_failed = set()
+        self._sorted_keywords = LANG_KEYWORDS_SORTED
 
     def get_vocab_terms(self, ns: str | None) -> dict[str, TermInfo]:
         if ns is None:
             return {}
 
-        if ns not in self._terms_by_ns:
-            self._terms_by_ns[ns] = self.graphcache.collect_vocab_terms(ns)
+        return self._get_vocab_index(ns).by_leaf
 
-        return self._terms_by_ns.get(ns) or {}
+    def _get_vocab_index(self, ns: str | None) -> _VocabIndex:
+        if ns is None:
+            return _EMPTY_VOCAB_INDEX
+
+        if vocab := self._terms_by_ns.get(ns):
+            return vocab
+
+        # NOTE: Lock per namespace, so that loading one does not block others.
+        with self._terms_locks.setdefault(ns, threading.Lock()):
+            if ns not in self._terms_by_ns:
+                terms = self.graphcache.collect_vocab_terms(ns)
+                sorted_items = sorted(terms.items())
+                self._terms_by_ns[ns] = _VocabIndex(
+                    terms, [key for key, _ in sorted_items], sorted_items
+                )
+
+        return self._terms_by_ns[ns]
+
+    def prewarm(self, namespaces: list[str]) -> None:
+        # NOTE: MATCH_NS_DECL also matches plain JSON string values, so only
+        # take what looks like vocabulary namespace IRIs.
+        namespaces = [
+            ns
+            for ns in namespaces
+            if ns.startswith(('http://', 'https://'))
+            and ns[-1] in '/#'
+            and ns not in self._terms_by_ns
+            and ns not in self._prewarm_failed
+        ]
+        if namespaces:
+            threading.Thread(
+                target=self._prewarm, args=(namespaces,), daemon=True
+            ).start()
+
+    def _prewarm(self, namespaces: list[str]) -> None:
+        for ns in namespaces:
+            try:
+                self.get_vocab_terms(ns)
+            except Exception as e:
+                logger.debug("Could not prewarm terms of <%s>: %s", ns, e)
+                self._prewarm_failed.add(ns)
 
     def get_completions(
         self, buffer: Lines, line: str, col: int, lang: str | None = None
     ) -> list[Completion]:
         term = get_term_at(line, col - 1)
-        assert term is not None
         pfx, cln, trail = term.partition(':')
 
         prefixdecl = line.split(':')[0].strip()
@@ -103,17 +174,22 @@ class RdfCompleter:
         else:
             pfxns = get_pfxns_map(buffer)
             ns = pfxns.get(pfx)
-            terms = self.get_vocab_terms(ns)
-            if terms and ':' in term:
-                return sorted(
+            vocab = self._get_vocab_index(ns)
+            if vocab.by_leaf and ':' in term:
+                return [
                     Completion(key, res_type, res_comment)
-                    for key, (res_type, res_comment) in terms.items()
-                    if key.startswith(trail)
-                )
-
-            keywords = self._keywords.get(lang, [])
-            curies = chain((pfx + ':' for pfx in sorted(pfxns)), terms, keywords)
-            results = (curie for curie in curies if curie.startswith(trail))
+                    for key, (res_type, res_comment) in vocab.sorted_items[
+                        prefixed_slice(vocab.sorted_keys, trail)
+                    ]
+                ]
+
+            pfx_keys = sorted(pfx + ':' for pfx in pfxns)
+            keywords = self._sorted_keywords.get(lang, [])
+            results = merge(
+                pfx_keys[prefixed_slice(pfx_keys, trail)],
+                vocab.sorted_keys[prefixed_slice(vocab.sorted_keys, trail)],
+                keywords[prefixed_slice(keywords, trail)],
+            )
 
         return [Completion(value) for value in results]
 
@@ -148,26 +224,28 @@ class RdfCompleter:
 
         return ns, lname or ''
 
+    def get_vocab_count(self) -> int:
+        # NOTE: Checks depend on which vocabularies are loaded.
+        return len(self.graphcache._terms_cache)
+
     def get_fs_path(self, url: str) -> Path:
         return self.graphcache._get_fs_path(url)
 
     def find_term_definition(
         self, lines: Lines, ns: str, lname: str
     ) -> tuple[int, int]:
-        prefixes: dict[str, str] = {}
-        expanded_term = f"<{ns}{lname}>"
+        defterm = f"<{ns}{lname}>"
+        found_pfx = False
         col = -1
         for at_line, l in enumerate(lines):
-            if at_line < MAX_LINE_SCAN:
+            if not found_pfx and at_line < MAX_LINE_SCAN:
                 for def_pfx, def_ns in get_pfxns(l):
-                    if def_ns not in prefixes:
-                        prefixes[def_ns] = def_pfx
-
-            dpfx = prefixes.get(ns)
-            defterm = f"{dpfx}:{lname}" if dpfx is not None else expanded_term
+                    if def_ns == ns:
+                        defterm = f"{def_pfx}:{lname}"
+                        found_pfx = True
+                        break
 
-            m = re.search(fr"^{re.escape(defterm)}\b", l)
-            if m:
+            if l.startswith(defterm) and _ends_term(l, len(defterm)):
                 col = 0
                 break
         else:
@@ -180,8 +258,7 @@ class RdfCompleter:
         if lang == 'sparql':
             return
 
-        data = ''.join(buffer)
-        if err := self.graphcache.check_data(data, lang):
+        if err := self.graphcache.check_data(buffer, lang):
             yield err
 
 
@@ -36,3 +36,5 @@ LANG_KEYWORDS['rdf'] = [
     'xmlns',
     'xml:lang',
 ]
+
+LANG_KEYWORDS_SORTED = {lang: sorted(set(kws)) for lang, kws in LANG_KEYWORDS.items()}
@@ -1,36 +1,43 @@
 from __future__ import annotations
 
+import asyncio
 import re
 from urllib.parse import quote, unquote
 
 from lsprotocol.types import (TEXT_DOCUMENT_COMPLETION,
                               TEXT_DOCUMENT_DEFINITION,
-                              TEXT_DOCUMENT_DID_CHANGE, TEXT_DOCUMENT_DID_OPEN,
+                              TEXT_DOCUMENT_DID_CHANGE,
+                              TEXT_DOCUMENT_DID_CLOSE, TEXT_DOCUMENT_DID_OPEN,
                               TEXT_DOCUMENT_DID_SAVE,
                               TEXT_DOCUMENT_IMPLEMENTATION, CompletionItem,
                               CompletionList, CompletionOptions,
                               CompletionParams, DefinitionOptions,
                               DefinitionParams, Diagnostic, DiagnosticOptions,
                               DidChangeTextDocumentParams,
+                              DidCloseTextDocumentParams,
                               DidOpenTextDocumentParams,
                               DidSaveTextDocumentParams, Location,
                               LocationLink, Position, Range)
 from pygls.server import LanguageServer
 
-from .completer import RdfCompleter
+from .completer import RdfCompleter, get_pfxns_map
 from .utils import get_term_at
 
 server = LanguageServer('rdflangserver', 'v0.1')
 
 rdfcompleter = RdfCompleter()
 
+CHECK_DELAY = 0.15
+
+_last_check: dict[str, tuple[int, list[Diagnostic]]] = {}
+
 
 # trigger_characters=[':', '=', ' ']
 @server.feature(TEXT_DOCUMENT_COMPLETION, CompletionOptions(resolve_provider=True))
 def completions(params: CompletionParams):
-    document, line, pos = _get_doc_line_and_pos(params)
+    document, lines, line, pos = _get_doc_line_and_pos(params)
     values = rdfcompleter.get_completions(
-        document.lines, line, pos.character, lang=document.language_id
+        lines, line, pos.character, lang=document.language_id
     )
     items = [
         CompletionItem(
@@ -49,11 +56,11 @@ def completions(params: CompletionParams):
 
 @server.feature(TEXT_DOCUMENT_DEFINITION, DefinitionOptions())
 def definition(params: DefinitionParams):
-    document, line, pos = _get_doc_line_and_pos(params)
+    document, lines, line, pos = _get_doc_line_and_pos(params)
     col = pos.character
 
     ns, lname = rdfcompleter.get_term(
-        document.lines, line, col, lang=document.language_id
+        lines, line, col, lang=document.language_id
     )
     if not ns:
         return
@@ -83,11 +90,18 @@ def definition(params: DefinitionParams):
 
 @server.feature(TEXT_DOCUMENT_DID_OPEN)
 async def did_open(ls, params: DidOpenTextDocumentParams):
+    document = ls.workspace.get_text_document(params.text_document.uri)
+    rdfcompleter.prewarm(list(get_pfxns_map(document.lines).values()))
     _check(ls, params)
 
 
 @server.feature(TEXT_DOCUMENT_DID_CHANGE)
 async def did_change(ls, params: DidChangeTextDocumentParams):
+    # Let rapid edits settle; only check the latest version of the document.
+    await asyncio.sleep(CHECK_DELAY)
+    document = ls.workspace.get_text_document(params.text_document.uri)
+    if document.version != params.text_document.version:
+        return
     _check(ls, params)
 
 
@@ -96,18 +110,31 @@ async def did_save(ls, params: DidSaveTextDocumentParams):
     _check(ls, params)
 
 
+@server.feature(TEXT_DOCUMENT_DID_CLOSE)
+async def did_close(ls, params: DidCloseTextDocumentParams):
+    _last_check.pop(params.text_document.uri, None)
+
+
 def _check(ls, params):
     document = ls.workspace.get_text_document(params.text_document.uri)
 
-    errors = rdfcompleter.check(document.lines, lang=document.language_id)
+    check_key = hash(
+        (document.language_id, document.source, rdfcompleter.get_vocab_count())
+    )
+    last_check = _last_check.get(document.uri)
+    if last_check and last_check[0] == check_key:
+        diagnostics = last_check[1]
+    else:
+        errors = rdfcompleter.check(document.lines, lang=document.language_id)
 
-    diagnostics = [
-        Diagnostic(
-            range=Range(start=Position(line, col), end=Position(line, col)),
-            message=msg,
-        )
-        for line, col, msg in errors
-    ]
+        diagnostics = [
+            Diagnostic(
+                range=Range(start=Position(line, col), end=Position(line, col)),
+                message=msg,
+            )
+            for line, col, msg in errors
+        ]
+        _last_check[document.uri] = check_key, diagnostics
 
     ls.publish_diagnostics(document.uri, diagnostics)
 
@@ -115,8 +142,10 @@ def _check(ls, params):
 def _get_doc_line_and_pos(params):
     document = server.workspace.get_document(params.text_document.uri)
     pos = params.position
-    line = document.lines[pos.line].removesuffix('\n')
-    return document, line, pos
+    # NOTE: Document.lines splits the source anew on each access.
+    lines = document.lines
+    line = lines[pos.line].removesuffix('\n')
+    return document, lines, line, pos
 
 
 def main():
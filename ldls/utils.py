@@ -1,13 +1,14 @@
-import re
+from bisect import bisect_left
+from string import ascii_letters, digits
 
-NOT_TERM_CHAR = re.compile(r'[^:A-Za-z0-9-_]|$')
+TERM_CHARS = frozenset(ascii_letters + digits + ':-_')
 
 # NOTE: Same tokens as trld.jsonld.base.PREFIX_DELIMS
 # (from <https://tools.ietf.org/html/rfc3986#section-2.2>).
-IRI_LOCAL = re.compile(r'([^:/?#\[\]@]*)$')
+IRI_DELIMS = ':/?#[]@'
 
 
-def get_term_at(line: str, i: int) -> str | None:
+def get_term_at(line: str, i: int) -> str:
     """
     >>> get_term_at('some rdf:term here', 7)
     'rdf:term'
@@ -17,18 +18,29 @@ def get_term_at(line: str, i: int) -> str | None:
     'here'
     >>> get_term_at('<> a bibo:Article', 16)
     'bibo:Article'
+    >>> get_term_at('', -1)
+    ''
+    >>> get_term_at('ab', -1)
+    ''
+
+    At or past the end of a line, the term ending the line is used (as when
+    the cursor is placed right after it):
+
+    >>> get_term_at('some rdf:term', 13)
+    'rdf:term'
     """
-    m = NOT_TERM_CHAR.search(line[i:])
-    if not m:
-        return None
-    front = m.span()[0]
+    if i < 0:
+        return ''
 
-    m = NOT_TERM_CHAR.search(line[i::-1])
-    if not m:
-        return None
-    back = m.span()[0]
+    end = i
+    while end < len(line) and line[end] in TERM_CHARS:
+        end += 1
 
-    return line[i - back + 1 : i + front]
+    start = min(i, len(line) - 1)
+    while start >= 0 and line[start] in TERM_CHARS:
+        start -= 1
+
+    return line[start + 1 : end]
 
 
 def split_iri(iri: str) -> tuple[str, str]:
@@ -39,9 +51,27 @@ def split_iri(iri: str) -> tuple[str, str]:
     ('http://example.org/ns/', 'term')
     >>> split_iri('urn:x-test:a')
     ('urn:x-test:', 'a')
+    >>> split_iri('term')
+    ('', 'term')
+    """
+    i = max(iri.rfind(c) for c in IRI_DELIMS)
+    return iri[: i + 1], iri[i + 1 :]
+
+
+def prefixed_slice(keys: list[str], prefix: str) -> slice:
+    """
+    Get the slice of a sorted list of keys which start with prefix.
+
+    >>> keys = ['a', 'ba', 'bb', 'bc', 'c']
+    >>> keys[prefixed_slice(keys, 'b')]
+    ['ba', 'bb', 'bc']
+    >>> keys[prefixed_slice(keys, 'd')]
+    []
     """
-    ns, local, empty = IRI_LOCAL.split(iri, maxsplit=1)
-    return ns, local
+    start = end = bisect_left(keys, prefix)
+    while end < len(keys) and keys[end].startswith(prefix):
+        end += 1
+    return slice(start, end)
 
 
 if __name__ == '__main__':